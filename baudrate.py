@@ -8,6 +8,9 @@
 #           pip install -r requirements.txt
 #           sudo python baudrate.py /dev/ttyUSB0
 
+import os
+import select
+import signal
 import subprocess
 import sys
 import termios
@@ -17,85 +20,345 @@ from argparse import ArgumentParser, RawDescriptionHelpFormatter
 from threading import Thread
 from platform import system
 
-import getch
-import serial
+# The optional acceleration packages (and pyserial itself) are imported
+# lazily from Open() so that quick invocations like -b/--baud-rates and
+# -h don't pay their import cost.
+serial = None
+numpy = None
+numba = None
+liburing = None
+
+
+def _import_heavy_modules():
+    """Imports pyserial and whichever optional accelerators are installed,
+    rebinding the class table and scan loop to their accelerated versions."""
+    global serial, numpy, numba, liburing, _CLASS_TABLE, _scan
+
+    if serial is not None:
+        return
+
+    import serial
+
+    try:
+        import numpy
+        _CLASS_TABLE = numpy.frombuffer(_CLASS_TABLE, numpy.uint8)
+    except ImportError:
+        pass
+
+    try:
+        import numba
+        # Compile the per-byte loop to native code; the signature is
+        # identical so the interpreted version remains the fallback.
+        _scan = numba.njit(cache=True)(_scan)
+    except ImportError:
+        pass
+
+    try:
+        import liburing
+    except ImportError:
+        pass
+
+
+# Byte classes stored in _CLASS_TABLE, indexed by byte value.
+CLASS_INVALID = 0
+CLASS_VALID = 1
+CLASS_WHITESPACE = 2
+CLASS_PUNCTUATION = 3
+CLASS_VOWEL = 4
+
+WHITESPACE = b' \t\r\n'
+PUNCTUATION = b'.,:;?!'
+VOWELS = b'aAeEiIoOuU'
+
+
+def _build_class_table():
+    """Classifies every possible byte value once so the read loop can use a
+    single indexed lookup instead of scanning lists."""
+    table = bytearray(256)
+    for x in range(ord("!"), ord("~") + 1):
+        table[x] = CLASS_VALID
+    for b in WHITESPACE:
+        table[b] = CLASS_WHITESPACE
+    for b in PUNCTUATION:
+        table[b] = CLASS_PUNCTUATION
+    for b in VOWELS:
+        table[b] = CLASS_VOWEL
+    return bytes(table)
+
+
+_CLASS_TABLE = _build_class_table()
+
+# Below this size the two vectorized passes cost more than the scalar loop.
+_VECTOR_MIN_CHUNK = 64
+
+
+def _scan(buf, table, counters, threshold):
+    """Classify each byte of buf through table, accumulating per-class tallies
+    in counters (indexed by byte class; an invalid byte resets them all).
+    Returns the index at which the detection thresholds were met, or -1."""
+    # Each requirement is latched in a bool the moment it is first satisfied,
+    # so the success test is an AND of flags rather than a recomputed
+    # comparison chain per byte.
+    have_ws = counters[2] > 0
+    have_punct = counters[3] > 0
+    have_vowel = counters[4] > 0
+    total = counters[1] + counters[2] + counters[3] + counters[4]
+    threshold_reached = total >= threshold
+
+    for i in range(len(buf)):
+        cls = table[buf[i]]
+
+        if cls == 0:
+            for j in range(len(counters)):
+                counters[j] = 0
+            have_ws = False
+            have_punct = False
+            have_vowel = False
+            total = 0
+            threshold_reached = False
+        else:
+            counters[cls] += 1
+            total += 1
+
+            if cls == 2:
+                have_ws = True
+            elif cls == 3:
+                have_punct = True
+            elif cls == 4:
+                have_vowel = True
+
+            if not threshold_reached:
+                threshold_reached = total >= threshold
+
+            if threshold_reached and have_ws and have_punct and have_vowel:
+                return i
+
+    return -1
+
+
+def _scan_vector(buf, table, counters, threshold):
+    """Classifies a whole chunk with two vectorized passes (a table gather
+    and a histogram) instead of a Python loop over every byte.  Chunks that
+    contain an invalid byte fall back to the scalar scan, which knows how to
+    reset the tallies mid-buffer."""
+    cls = table[buf]
+
+    if (cls == CLASS_INVALID).any():
+        return _scan(buf, table, counters, threshold)
+
+    counters += numpy.bincount(cls, minlength=len(counters))
+
+    if (counters[2] > 0 and counters[3] > 0 and counters[4] > 0 and
+            counters[1] + counters[2] + counters[3] + counters[4] >= threshold):
+        return len(buf) - 1
+
+    return -1
+
+
+def _make_scanner(threshold):
+    """Returns a chunk-scanning callable with the class table and threshold
+    baked in (partial evaluation): the hot path passes only the data that
+    changes per read, and under numba the baked-in values are compile-time
+    constants folded into the jitted loop."""
+    table = _CLASS_TABLE
+
+    if numba is not None:
+        jit_scan = numba.njit(lambda buf, counters: _scan(buf, table, counters, threshold))
+
+        def scanner(chunk, counters):
+            return jit_scan(numpy.frombuffer(chunk, numpy.uint8), counters)
+    elif numpy is not None:
+        def scanner(chunk, counters):
+            if len(chunk) >= _VECTOR_MIN_CHUNK:
+                return _scan_vector(numpy.frombuffer(chunk, numpy.uint8), table, counters, threshold)
+            return _scan(chunk, table, counters, threshold)
+    else:
+        def scanner(chunk, counters):
+            return _scan(chunk, table, counters, threshold)
+
+    return scanner
+
+
+class _UringReader:
+    """Reads from the serial fd through io_uring, keeping several reads queued
+    so completions are reaped without one kernel entry per read() call.  Only
+    used on Linux when the optional liburing package is importable."""
+
+    QUEUE_DEPTH = 8
+    BUF_SIZE = 512
+
+    def __init__(self, fd):
+        self.fd = fd
+        self.ring = liburing.Ring()
+        self.cqe = liburing.Cqe()
+        liburing.io_uring_queue_init(self.QUEUE_DEPTH, self.ring)
+        self.bufs = [bytearray(self.BUF_SIZE) for _ in range(self.QUEUE_DEPTH)]
+        for i in range(self.QUEUE_DEPTH):
+            self._submit(i)
+
+    def _submit(self, i):
+        # pyserial opens the port O_NONBLOCK with VMIN=0, so a bare read
+        # completes instantly with res=0 instead of poll-arming.  Link an
+        # explicit POLLIN poll in front of each read so the pair only
+        # completes once data is actually available.
+        sqe = liburing.io_uring_get_sqe(self.ring)
+        liburing.io_uring_prep_poll_add(sqe, self.fd, select.POLLIN)
+        sqe.flags |= liburing.IOSQE_IO_LINK
+        sqe.user_data = i + self.QUEUE_DEPTH
+
+        sqe = liburing.io_uring_get_sqe(self.ring)
+        liburing.io_uring_prep_read(sqe, self.fd, self.bufs[i])
+        sqe.user_data = i
+
+        liburing.io_uring_submit(self.ring)
+
+    def read(self, timeout):
+        """Waits up to timeout seconds for completed reads and returns all
+        completed buffers concatenated, or b'' on timeout/error."""
+        deadline = time.monotonic() + timeout
 
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return b''
 
-class RawInput:
-    """Gets a single character from standard input.  Does not echo to the screen."""
-    def __init__(self):
-        if system() == "Windows":
-            self.impl = RawInputWindows()
-        else:
-            self.impl = RawInputUnix()
+            try:
+                liburing.io_uring_wait_cqe_timeout(self.ring, self.cqe, liburing.timespec(remaining))
+            except (OSError, BlockingIOError):
+                return b''
+
+            data = b''
+
+            # Reap every completion that is ready, then requeue the buffers
+            # whose poll+read pair finished.  Poll completions carry no data
+            # and a read that raced to res<=0 just gets requeued: neither
+            # counts as the detection-window timeout.
+            ready = liburing.io_uring_cq_ready(self.ring)
+            completed = []
+
+            for n in range(ready):
+                entry = self.cqe[n]
+                i = entry.user_data
 
-    def __call__(self): return self.impl()
+                if i >= self.QUEUE_DEPTH:
+                    continue
+
+                if entry.res > 0:
+                    data += bytes(self.bufs[i][:entry.res])
+
+                completed.append(i)
+
+            liburing.io_uring_cq_advance(self.ring, ready)
+
+            for i in completed:
+                self._submit(i)
+
+            if data:
+                return data
+
+    def close(self):
+        liburing.io_uring_queue_exit(self.ring)
 
 
 class RawInputUnix:
-    def __call__(self):
-        fd = sys.stdin.fileno()
-        old_settings = termios.tcgetattr(fd)
-        try:
-            tty.setraw(sys.stdin.fileno())
-            ch = sys.stdin.read(1)
-        finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-        return ch
+    def __enter__(self):
+        # Enter raw mode once up front rather than saving, setting and
+        # restoring termios state around every keypress.
+        self.fd = sys.stdin.fileno()
+        self.old_settings = termios.tcgetattr(self.fd)
+        tty.setraw(self.fd)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        termios.tcsetattr(self.fd, termios.TCSADRAIN, self.old_settings)
+
+    def read_char(self):
+        return os.read(self.fd, 1).decode('latin-1')
 
 
 class RawInputWindows:
-    def __call__(self):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def read_char(self):
         return getch.getch()
 
+
+# Gets single characters from standard input without echoing them.  The
+# platform implementation is chosen once at import time; use as a context
+# manager so the terminal is only switched to raw mode once.
+if system() == "Windows":
+    import getch
+    RawInput = RawInputWindows
+else:
+    RawInput = RawInputUnix
+
 class Baudrate:
 
     VERSION = '3.0'
     READ_TIMEOUT = 5
-    BAUDRATES = [
-        "110",
-        "300",
-        "600",
-        "1200",
-        "1800",
-        "2400",
-        "3600",
-        "4800",
-        "7200",
-        "9600",
-        "14400",
-        "19200",
-        "28800",
-        "31250",
-        "38400",
-        "57600",
-        "76800",
-        "115200",
-        "128000",
-        "153600",
-        "230400",
-        "250000",
-        "256000",
-        "307200",
-        "345600",
-        "460800",
-        "500000",
-        "512000",
-        "921600",
-        "1024000",
-        "2000000",
-        "2500000",
-        "3000000",
-        "3686400",
-    ]
-
-    UPKEYS = ['u', 'U', 'A']
-    DOWNKEYS = ['d', 'D', 'B']
+    # Per-read blocking time; the READ_TIMEOUT window is enforced by Detect
+    # itself, so a blocked read never pins the loop for the whole window.
+    POLL_TIMEOUT = 0.05
+    BAUDRATES = (
+        110,
+        300,
+        600,
+        1200,
+        1800,
+        2400,
+        3600,
+        4800,
+        7200,
+        9600,
+        14400,
+        19200,
+        28800,
+        31250,
+        38400,
+        57600,
+        76800,
+        115200,
+        128000,
+        153600,
+        230400,
+        250000,
+        256000,
+        307200,
+        345600,
+        460800,
+        500000,
+        512000,
+        921600,
+        1024000,
+        2000000,
+        2500000,
+        3000000,
+        3686400,
+    )
+
+    UPKEYS = frozenset(['u', 'U', 'A'])
+    DOWNKEYS = frozenset(['d', 'D', 'B'])
+
+    # Maps a keypress to the step it feeds into NextBaudrate.
+    _KEY_DELTAS = dict([(k, 1) for k in UPKEYS] + [(k, -1) for k in DOWNKEYS])
 
     MIN_CHAR_COUNT = 25
-    WHITESPACE = [' ', '\t', '\r', '\n']
-    PUNCTUATION = ['.', ',', ':', ';', '?', '!']
-    VOWELS = ['a', 'A', 'e', 'E', 'i', 'I', 'o', 'O', 'u', 'U']
+
+    _MINICOM_TEMPLATE = (
+        "########################################################################\n"
+        "# Minicom configuration file - use \"minicom -s\" to change parameters.\n"
+        "pu port             {port}\n"
+        "pu baudrate         {baud}\n"
+        "pu bits             8\n"
+        "pu parity           N\n"
+        "pu stopbits         1\n"
+        "pu rtscts           No\n"
+        "########################################################################\n"
+    )
 
     def __init__(self, port=None, threshold=MIN_CHAR_COUNT, timeout=READ_TIMEOUT, name=None, auto=True, verbose=False):
         self.port = port
@@ -105,20 +368,18 @@ class Baudrate:
         self.auto_detect = auto
         self.verbose = verbose
         self.index = len(self.BAUDRATES) - 1
-        self.valid_characters = []
+        self._current_baud = self.BAUDRATES[self.index]
         self.ctlc = False
         self.thread = None
-
-        self._gen_char_list()
-
-    def _gen_char_list(self):
-        self.valid_characters = [chr(x) for x in range(ord("!"), ord("~")+1)]
-        self.valid_characters.extend(self.WHITESPACE)
+        self.uring = None
+        self._wake_r = None
+        self._wake_w = None
 
     def _print(self, data):
+        # No flush here: the buffer coalesces writes and is flushed when the
+        # baudrate changes and when Detect returns.
         if self.verbose:
             sys.stderr.buffer.write(data)
-            sys.stderr.buffer.flush()
 
     def __enter__(self):
         self.Open()
@@ -128,8 +389,53 @@ class Baudrate:
         # ignore the exception info, let it bubble up
         self.Close()
 
+    def _handle_sigint(self, signum, frame):
+        # Flag the loops to stop, then wake whatever the loop is blocked in.
+        # select() is retried automatically after a handler returns (PEP 475),
+        # so the self-pipe is what actually interrupts it on POSIX;
+        # cancel_read() only helps the Windows path blocked in Serial.read.
+        self.ctlc = True
+
+        if self._wake_w is not None:
+            try:
+                os.write(self._wake_w, b'\x00')
+            except OSError:
+                pass
+        else:
+            try:
+                self.serial.cancel_read()
+            except (AttributeError, OSError):
+                pass
+
     def Open(self):
-        self.serial = serial.Serial(self.port, timeout=self.timeout)
+        _import_heavy_modules()
+
+        self.serial = serial.Serial(self.port, timeout=self.POLL_TIMEOUT, exclusive=True)
+
+        if system() != "Windows":
+            # Self-pipe for the SIGINT handler to wake the select() loop.
+            self._wake_r, self._wake_w = os.pipe()
+            os.set_blocking(self._wake_w, False)
+
+        # FTDI/USB-serial drivers coalesce reads for ~16ms by default, which
+        # slows down how fast Detect can accumulate characters at each baud
+        # rate.  Ask the driver for low latency (ASYNC_LOW_LATENCY) where the
+        # platform and pyserial version support it.
+        try:
+            self.serial.set_low_latency_mode(True)
+        except (AttributeError, NotImplementedError, ValueError, OSError):
+            pass
+
+        # Only auto mode uses the uring reader; in manual mode its queued
+        # reads would steal bytes from the select() loop.
+        if liburing is not None and system() == "Linux" and self.auto_detect:
+            # AttributeError/TypeError cover liburing versions whose API no
+            # longer matches; an optional accelerator must never abort Open().
+            try:
+                self.uring = _UringReader(self.serial.fileno())
+            except (OSError, AttributeError, TypeError):
+                self.uring = None
+
         self.NextBaudrate(0)
 
     def NextBaudrate(self, updn):
@@ -141,81 +447,152 @@ class Baudrate:
         elif self.index < 0:
             self.index = len(self.BAUDRATES) - 1
 
-        sys.stderr.write('\n\n@@@@@@@@@@@@@@@@@@@@@ Baudrate: %s @@@@@@@@@@@@@@@@@@@@@\n\n' % self.BAUDRATES[self.index])
+        self._current_baud = self.BAUDRATES[self.index]
+
+        sys.stderr.buffer.flush()
+        sys.stderr.write('\n\n@@@@@@@@@@@@@@@@@@@@@ Baudrate: %s @@@@@@@@@@@@@@@@@@@@@\n\n' % self._current_baud)
 
-        self.serial.flush()
-        self.serial.baudrate = self.BAUDRATES[self.index]
-        self.serial.flush()
+        self.serial.baudrate = self._current_baud
+        # Discard whatever was received at the old baud rate so stale bytes
+        # don't contaminate classification at the new one.  The previous
+        # flush() calls waited for transmit drain, which a read-only scanner
+        # never needs and which could block on a half-configured port.
+        self.serial.reset_input_buffer()
 
     def Detect(self):
-        count = 0
-        whitespace = 0
-        punctuation = 0
-        vowels = 0
+        # monotonic is immune to wall-clock jumps and a local binding skips
+        # the module attribute lookup on every loop iteration.
+        monotonic = time.monotonic
         start_time = 0
         timed_out = False
-        clear_counters = False
+        detected = False
+
+        # Bind everything that is invariant for the lifetime of this call to
+        # locals so the loop does LOAD_FAST instead of repeated attribute
+        # lookups.  self.ctlc stays an attribute access: the key and signal
+        # handlers mutate it behind our back.
+        auto_detect = self.auto_detect
+        timeout = self.timeout
+        scan = _make_scanner(self.threshold)
+        uring = self.uring
+        ser = self.serial
+        read = ser.read
+        serial_fd = ser.fileno()
+        wake_fd = self._wake_r
+        _print = self._print
+
+        # One tally per byte class (CLASS_INVALID..CLASS_VOWEL).
+        if numpy is not None:
+            counters = numpy.zeros(5, numpy.int64)
+        else:
+            counters = [0] * 5
+
+        # select() cannot watch serial handles or stdin on Windows, so the
+        # keypress thread remains the fallback there; everywhere else both
+        # I/O sources are multiplexed in this one loop.
+        use_select = system() != "Windows"
 
-        if not self.auto_detect:
+        if not auto_detect and not use_select:
             self.thread = Thread(None, self.HandleKeypress, None, (self, 1))
             self.thread.start()
 
-        while True:
-            if start_time == 0:
-                start_time = time.time()
-
-            byte = self.serial.read(1)
+        userinput = None
+        stdin_fd = None
+        if not auto_detect and use_select:
+            userinput = RawInput()
+            userinput.__enter__()
+            stdin_fd = sys.stdin.fileno()
 
-            if byte:
-                if self.auto_detect and byte in self.valid_characters:
-                    if byte in self.WHITESPACE:
-                        whitespace += 1
-                    elif byte in self.PUNCTUATION:
-                        punctuation += 1
-                    elif byte in self.VOWELS:
-                        vowels += 1
+        # The flag-only handler is scoped to this loop: nothing outside it
+        # checks ctlc, so anywhere else Ctrl-C should keep raising
+        # KeyboardInterrupt as usual.
+        old_sigint = signal.signal(signal.SIGINT, self._handle_sigint)
 
-                    count += 1
+        try:
+            while not self.ctlc:
+                if start_time == 0:
+                    start_time = monotonic()
+
+                chunk = b''
+
+                if uring is not None and auto_detect:
+                    # Auto mode only watches the serial port, so the queued
+                    # io_uring reads can replace select() entirely.
+                    chunk = uring.read(max(0, timeout - (monotonic() - start_time)))
+                    if not chunk:
+                        timed_out = True
+                elif use_select:
+                    rlist = [serial_fd, wake_fd]
+                    if userinput is not None:
+                        rlist.append(stdin_fd)
+
+                    # In auto mode the select timeout doubles as the baudrate
+                    # switch timer; in manual mode a keypress wakes the loop.
+                    if auto_detect:
+                        remaining = max(0, timeout - (monotonic() - start_time))
+                    else:
+                        remaining = None
+
+                    readable, _, _ = select.select(rlist, [], [], remaining)
+
+                    if wake_fd in readable:
+                        # SIGINT handler woke us; ctlc is already set and the
+                        # loop condition will see it.
+                        os.read(wake_fd, 1)
+
+                    if userinput is not None and stdin_fd in readable:
+                        self.HandleKey(userinput.read_char())
+
+                    if serial_fd in readable:
+                        # Drain everything that has already arrived in one
+                        # call instead of paying a pyserial round-trip per
+                        # byte; select guarantees at least one byte is ready.
+                        chunk = read(max(1, ser.in_waiting))
+                    elif not readable:
+                        timed_out = True
                 else:
-                    clear_counters = True
-
-                self._print(byte)
-
-                if count >= self.threshold and whitespace > 0 and punctuation > 0 and vowels > 0:
-                    break
-                elif (time.time() - start_time) >= self.timeout:
-                    timed_out = True
-            else:
-                timed_out = True
-
-            if timed_out and self.auto_detect:
-                start_time = 0
-                self.NextBaudrate(-1)
-                clear_counters = True
-                timed_out = False
-
-            if clear_counters:
-                whitespace = 0
-                punctuation = 0
-                vowels = 0
-                count = 0
-                clear_counters = False
+                    # The short POLL_TIMEOUT means an empty read no longer
+                    # implies the whole detection window has elapsed.
+                    chunk = read(max(1, ser.in_waiting))
+                    if not chunk and (monotonic() - start_time) >= timeout:
+                        timed_out = True
+
+                if chunk:
+                    if auto_detect and scan(chunk, counters) >= 0:
+                        detected = True
+
+                    _print(chunk)
+
+                    if detected:
+                        break
+                    elif (monotonic() - start_time) >= timeout:
+                        timed_out = True
+
+                if timed_out and auto_detect and not self.ctlc:
+                    start_time = 0
+                    self.NextBaudrate(-1)
+                    for i in range(len(counters)):
+                        counters[i] = 0
+                    timed_out = False
+        finally:
+            signal.signal(signal.SIGINT, old_sigint)
+            sys.stderr.buffer.flush()
+            if userinput is not None:
+                userinput.__exit__(None, None, None)
 
-            if self.ctlc:
-                break
+        return self._current_baud
 
-        return self.BAUDRATES[self.index]
+    def HandleKey(self, c):
+        updn = self._KEY_DELTAS.get(c)
+        if updn:
+            self.NextBaudrate(updn)
+        elif c == '\x03':
+            self.ctlc = True
 
     def HandleKeypress(self, *args):
-        userinput = RawInput()
-        while not self.ctlc:
-            c = userinput()
-            if c in self.UPKEYS:
-                self.NextBaudrate(1)
-            elif c in self.DOWNKEYS:
-                self.NextBaudrate(-1)
-            elif c == '\x03':
-                self.ctlc = True
+        with RawInput() as userinput:
+            while not self.ctlc:
+                self.HandleKey(userinput.read_char())
 
     def MinicomConfig(self, name=None):
         success = True
@@ -223,19 +600,12 @@ class Baudrate:
         if name is None:
             name = self.name
 
-        config =  "########################################################################\n"
-        config += "# Minicom configuration file - use \"minicom -s\" to change parameters.\n"
-        config += "pu port             %s\n" % self.port
-        config += "pu baudrate         %s\n" % self.BAUDRATES[self.index]
-        config += "pu bits             8\n"
-        config += "pu parity           N\n"
-        config += "pu stopbits         1\n"
-        config += "pu rtscts           No\n"
-        config += "########################################################################\n"
+        config = self._MINICOM_TEMPLATE.format(port=self.port, baud=self._current_baud)
 
         if name is not None and name:
             try:
-                open("/etc/minicom/minirc.%s" % name, "w").write(config)
+                with open("/etc/minicom/minirc.%s" % name, "w") as f:
+                    f.write(config)
             except Exception as e:
                 print("Error saving minicom config file:", str(e))
                 success = False
@@ -244,6 +614,14 @@ class Baudrate:
 
     def Close(self):
         self.ctlc = True
+        if self._wake_r is not None:
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+            self._wake_r = None
+            self._wake_w = None
+        if self.uring is not None:
+            self.uring.close()
+            self.uring = None
         self.serial.close()
 
 if __name__ == '__main__':